@@ -19,7 +19,7 @@ Modified:
 """
 
 from PyQt5 import QtWidgets, uic
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QStandardPaths
 from qgis.core import (
     QgsProject,
     QgsVectorLayer,
@@ -27,27 +27,36 @@ from qgis.core import (
     QgsMessageLog,
     Qgis,
     QgsFeature,
+    QgsFeatureRequest,
     QgsGeometry,
     QgsCoordinateReferenceSystem,
     QgsCoordinateTransform,
     QgsSpatialIndex,
     QgsRectangle,
-    QgsPointXY,
     QgsWkbTypes,
 )
 import time
 import os
 import csv
+import hashlib
+import io
 import json
-import math
 import tempfile
+import math
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import xml.etree.ElementTree as ET
 from owslib.wfs import WebFeatureService
 
+XSD_ELEMENT_TAG = "{http://www.w3.org/2001/XMLSchema}element"
+
 
 class NearestAnalysisDialog(QtWidgets.QDialog):
+    # Compass sectors for _azimuth_to_dir, 45° each, starting at North
+    DIRECTIONS_8 = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+
     def __init__(self, parent=None):
         super().__init__()
         uic.loadUi(os.path.join(os.path.dirname(__file__), "Nearest_Analysis_dialog_base.ui"), self)
@@ -55,6 +64,7 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
         # ---- WFS endpoint (EPA) ----
         self.WFS_URL = "https://gis.epa.ie/geoserver/EPA/wfs"
         self.WFS_VERSION = "1.1.0"
+        self.WFS_SRS_URN = "urn:ogc:def:crs:EPSG::29903"
 
         # ---- Attribution text (EPA requirement) ----
         self.EPA_ATTRIBUTION = "Contains data from the Environmental Protection Agency (EPA), licensed under CC BY 4.0"
@@ -65,6 +75,13 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
         # Cache: key = (api_display_name, app_layer_uri, buffer_distance_m)
         self.api_pre_filtered = {}
 
+        # Cache: key = (app_layer_uri, layer_crs_authid) -> application state (see _app_state)
+        self.app_geom_cache = {}
+        self.app_layers_watched = set()  # layer ids with afterCommitChanges hooked to cache invalidation
+
+        # Matplotlib figure reused across runs while its window stays open
+        self.analysis_fig = None
+
         # Track last analysis inputs for auto cache invalidation
         self.last_analysis_signature = None
 
@@ -84,21 +101,44 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
         self.wfs_layers_info = {}
         self.shp_layers = []
         self.api_layers = []
+        self.api_layers_by_name = {}    # key: layer name -> first QgsVectorLayer with that name
 
         # Caches for field metadata
         self.wfs_fields_cache = {}      # key: type_name -> [field names]
         self.arcgis_fields_cache = {}   # key: json_url -> [field names]
+        self.arcgis_info_cache = {}     # key: layer_url -> layer metadata dict
 
-        # Reuse one session
+        # Reuse one session (keep-alive connection pool)
         self.http = requests.Session()
         self.http.headers.update({"User-Agent": "QGIS-NearestAnalysis"})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
 
         # Timeouts
         self.timeout_meta = (10, 120)
         self.timeout_data = (10, 180)
 
+        # Chunk size for streaming downloads to disk (bytes)
+        self.download_chunk_size = 1024 * 1024
+
+        # On-disk cache of downloaded API GeoJSON, reused across QGIS sessions
+        cache_root = QStandardPaths.writableLocation(QStandardPaths.CacheLocation) or tempfile.gettempdir()
+        self.download_cache_dir = os.path.join(cache_root, "nearest_analysis")
+        self.download_cache_ttl_s = 6 * 3600
+
+        # ArcGIS REST paging (page size is capped by the layer's maxRecordCount)
+        self.arcgis_page_size = 2000
+        self.arcgis_page_workers = 4
+
         self.metric_crs = QgsCoordinateReferenceSystem("EPSG:29903")
 
+        # Cache: key = (src_crs_authid_or_wkt, dst_crs_authid_or_wkt) -> QgsCoordinateTransform
+        self.transform_cache = {}
+
+        # Simplification tolerance (meters) for spatial index geometries
+        self.simplify_tolerance_m = 5.0
+
         self.populate_layers()
 
     # -------------------------------
@@ -162,6 +202,20 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
     # -------------------------------
     # CRS / geometry helpers
     # -------------------------------
+    def _coordinate_transform(self, src_crs: QgsCoordinateReferenceSystem,
+                              dst_crs: QgsCoordinateReferenceSystem) -> QgsCoordinateTransform:
+        """
+        Return a cached QgsCoordinateTransform for the CRS pair, so the per-feature
+        path is a dict lookup instead of constructing a new transform object.
+        Keyed by authid, falling back to WKT for CRSs without one.
+        """
+        key = (src_crs.authid() or src_crs.toWkt(), dst_crs.authid() or dst_crs.toWkt())
+        tr = self.transform_cache.get(key)
+        if tr is None:
+            tr = QgsCoordinateTransform(src_crs, dst_crs, QgsProject.instance())
+            self.transform_cache[key] = tr
+        return tr
+
     def _transform_geometry(self, geom: QgsGeometry, src_crs: QgsCoordinateReferenceSystem,
                             dst_crs: QgsCoordinateReferenceSystem = None) -> QgsGeometry:
         if dst_crs is None:
@@ -179,7 +233,7 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
 
         g = QgsGeometry(geom)
         try:
-            tr = QgsCoordinateTransform(src_crs, dst_crs, QgsProject.instance())
+            tr = self._coordinate_transform(src_crs, dst_crs)
             ok = g.transform(tr)
             if ok != 0:
                 self.log("Geometry transform returned non-zero status.")
@@ -189,17 +243,24 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
             return QgsGeometry(geom)
 
     def _layer_geometries_in_29903(self, layer: QgsVectorLayer):
-        """Return transformed feature list and unary union in EPSG:29903."""
+        """
+        Return transformed feature list and unary union in EPSG:29903.
+        Reprojection is done by the provider's feature iterator (destination CRS on
+        the request), so geometries arrive already in EPSG:29903.
+        """
         feats_29903 = []
         src_crs = layer.crs()
 
+        request = QgsFeatureRequest()
+        if src_crs.isValid():
+            request.setDestinationCrs(self.metric_crs, QgsProject.instance().transformContext())
+        else:
+            self.log("Invalid source CRS; geometry returned unchanged.")
+
         union_geom = None
-        for f in layer.getFeatures():
-            geom = f.geometry()
-            if not geom or geom.isEmpty():
-                continue
-            geom_29903 = self._transform_geometry(geom, src_crs, self.metric_crs)
-            if geom_29903.isEmpty():
+        for f in layer.getFeatures(request):
+            geom_29903 = f.geometry()
+            if not geom_29903 or geom_29903.isEmpty():
                 continue
 
             new_f = QgsFeature()
@@ -221,6 +282,83 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
 
         return feats_29903, union_geom
 
+    def _layer_source_stamp(self, layer: QgsVectorLayer):
+        """
+        Validity stamp of a file-based layer source, or None if not a local file.
+        Combines mtime and size of the file and of its SQLite "-wal" sidecar, since
+        GeoPackage edits land in the WAL and reach the main file only at checkpoint.
+        """
+        path = (layer.dataProvider().dataSourceUri() or "").split("|")[0]
+        try:
+            if not path or not os.path.isfile(path):
+                return None
+            stamp = []
+            for p in (path, path + "-wal"):
+                if os.path.isfile(p):
+                    st = os.stat(p)
+                    stamp.append((st.st_mtime_ns, st.st_size))
+                else:
+                    stamp.append(None)
+            return tuple(stamp)
+        except OSError:
+            return None
+
+    def _drop_app_state(self, app_uri: str) -> None:
+        """Forget cached application state for a data source (e.g. after edits are committed)."""
+        for key in [k for k in self.app_geom_cache if k[0] == app_uri]:
+            del self.app_geom_cache[key]
+
+    def _watch_app_layer(self, layer: QgsVectorLayer) -> None:
+        """Invalidate the layer's cached state whenever QGIS commits edits to it."""
+        if layer.id() in self.app_layers_watched:
+            return
+        app_uri = layer.dataProvider().dataSourceUri()
+        layer.afterCommitChanges.connect(lambda: self._drop_app_state(app_uri))
+        self.app_layers_watched.add(layer.id())
+
+    def _app_state(self, layer: QgsVectorLayer) -> dict:
+        """
+        Application union in EPSG:29903 plus derived geometries reused across runs:
+        centroid, prepared GEOS engine and buffers keyed by distance.
+        Cached while the layer source is unchanged on disk (see _layer_source_stamp)
+        and no edits have been committed to it in QGIS.
+        Layers in edit mode or without a local file source are always re-read.
+        """
+        stamp = self._layer_source_stamp(layer)
+        cacheable = stamp is not None and not layer.isEditable()
+
+        key = (layer.dataProvider().dataSourceUri(), layer.crs().authid())
+        cached = self.app_geom_cache.get(key) if cacheable else None
+        if cached and cached["stamp"] == stamp:
+            self.log("Using cached application geometries.")
+            return cached
+
+        _, union_geom = self._layer_geometries_in_29903(layer)
+        state = {
+            "stamp": stamp,
+            "union": union_geom,
+            "centroid": None,
+            "engine": None,
+            "buffers": {},
+        }
+        if union_geom and not union_geom.isEmpty():
+            state["centroid"] = union_geom.centroid()
+            state["engine"] = self._prepared_engine(union_geom)
+
+        if cacheable:
+            self._watch_app_layer(layer)
+            self.app_geom_cache[key] = state
+        return state
+
+    def _app_buffer(self, app_state: dict, distance_m: float) -> QgsGeometry:
+        """Buffer of the application union, cached per distance in app_state."""
+        key = round(distance_m, 3)
+        buffer_geom = app_state["buffers"].get(key)
+        if buffer_geom is None:
+            buffer_geom = app_state["union"].buffer(distance_m, 8)
+            app_state["buffers"][key] = buffer_geom
+        return buffer_geom
+
     def _geom_bbox_str(self, geom: QgsGeometry) -> str:
         rect = geom.boundingBox()
         return f"{rect.xMinimum()},{rect.yMinimum()},{rect.xMaximum()},{rect.yMaximum()}"
@@ -228,12 +366,22 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
     def _rect_to_qgsrect(self, geom: QgsGeometry) -> QgsRectangle:
         return geom.boundingBox()
 
+    def _rect_distance(self, r1: QgsRectangle, r2: QgsRectangle) -> float:
+        """Distance between two envelopes; a lower bound of the geometry distance."""
+        dx = max(0.0, r1.xMinimum() - r2.xMaximum(), r2.xMinimum() - r1.xMaximum())
+        dy = max(0.0, r1.yMinimum() - r2.yMaximum(), r2.yMinimum() - r1.yMaximum())
+        return math.hypot(dx, dy)
+
     # -------------------------------
     # Geometry drawing helpers
     # -------------------------------
     def _plot_qgs_geometry(self, ax, geom: QgsGeometry, color="blue", linewidth=1.5,
-                           alpha=1.0, marker=None, markersize=50, label=None):
-        """Plot QGIS geometry on a Matplotlib axis."""
+                           alpha=1.0, marker=None, markersize=50, label=None, rasterized=False):
+        """
+        Plot QGIS geometry on a Matplotlib axis.
+        rasterized=True draws the geometry as a bitmap in vector exports (PDF),
+        which keeps large polygons cheap to render; axes and labels stay vector.
+        """
         if not geom or geom.isEmpty():
             return
 
@@ -260,45 +408,66 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
         if gtype == "Point":
             x, y = coords
             ax.scatter([x], [y], s=markersize, marker=marker or "o",
-                       color=color, alpha=alpha, label=add_label())
+                       color=color, alpha=alpha, label=add_label(), rasterized=rasterized)
         elif gtype == "MultiPoint":
             xs = [p[0] for p in coords]
             ys = [p[1] for p in coords]
             ax.scatter(xs, ys, s=markersize, marker=marker or "o",
-                       color=color, alpha=alpha, label=add_label())
+                       color=color, alpha=alpha, label=add_label(), rasterized=rasterized)
         elif gtype == "LineString":
             xs = [p[0] for p in coords]
             ys = [p[1] for p in coords]
-            ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label())
+            ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label(),
+                    rasterized=rasterized)
         elif gtype == "MultiLineString":
             for line in coords:
                 xs = [p[0] for p in line]
                 ys = [p[1] for p in line]
-                ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label())
+                ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label(),
+                        rasterized=rasterized)
         elif gtype == "Polygon":
             exterior = coords[0]
             xs = [p[0] for p in exterior]
             ys = [p[1] for p in exterior]
-            ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label())
+            ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label(),
+                    rasterized=rasterized)
             for ring in coords[1:]:
                 xs = [p[0] for p in ring]
                 ys = [p[1] for p in ring]
-                ax.plot(xs, ys, color=color, linewidth=max(0.7, linewidth * 0.7), alpha=alpha)
+                ax.plot(xs, ys, color=color, linewidth=max(0.7, linewidth * 0.7), alpha=alpha,
+                        rasterized=rasterized)
         elif gtype == "MultiPolygon":
             for poly in coords:
                 exterior = poly[0]
                 xs = [p[0] for p in exterior]
                 ys = [p[1] for p in exterior]
-                ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label())
+                ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label(),
+                        rasterized=rasterized)
                 for ring in poly[1:]:
                     xs = [p[0] for p in ring]
                     ys = [p[1] for p in ring]
-                    ax.plot(xs, ys, color=color, linewidth=max(0.7, linewidth * 0.7), alpha=alpha)
+                    ax.plot(xs, ys, color=color, linewidth=max(0.7, linewidth * 0.7), alpha=alpha,
+                            rasterized=rasterized)
         else:
             rect = geom.boundingBox()
             xs = [rect.xMinimum(), rect.xMaximum(), rect.xMaximum(), rect.xMinimum(), rect.xMinimum()]
             ys = [rect.yMinimum(), rect.yMinimum(), rect.yMaximum(), rect.yMaximum(), rect.yMinimum()]
-            ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label())
+            ax.plot(xs, ys, color=color, linewidth=linewidth, alpha=alpha, label=add_label(),
+                    rasterized=rasterized)
+
+    def _analysis_figure(self, plt):
+        """
+        Return (fig, ax, reused), clearing and reusing the previous figure if its
+        window is still open. A reused window gets no initial resize event, so the
+        caller must request a redraw before showing it.
+        """
+        if self.analysis_fig is not None and plt.fignum_exists(self.analysis_fig.number):
+            self.analysis_fig.clf()
+            ax = self.analysis_fig.add_subplot(111)
+            return self.analysis_fig, ax, True
+
+        self.analysis_fig, ax = plt.subplots(figsize=(10, 10))
+        return self.analysis_fig, ax, False
 
     def _point_from_geometry(self, geom: QgsGeometry):
         if not geom or geom.isEmpty():
@@ -369,7 +538,7 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
                 if type_name in src:
                     self.log(f"WFS layer already loaded: {lyr.name()}")
                     if lyr not in self.api_layers:
-                        self.api_layers.append(lyr)
+                        self._register_api_layer(lyr)
                     return
 
         uri = QgsDataSourceUri()
@@ -389,7 +558,11 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
 
         QgsProject.instance().addMapLayer(wfs_layer)
         self.log(f"Loaded WFS layer into QGIS: {wfs_layer.name()}")
-        self.api_layers.append(wfs_layer)
+        self._register_api_layer(wfs_layer)
+
+    def _register_api_layer(self, layer: QgsVectorLayer) -> None:
+        self.api_layers.append(layer)
+        self.api_layers_by_name.setdefault(layer.name(), layer)
 
     def on_api_selection_changed(self) -> None:
         try:
@@ -406,6 +579,7 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
         self.combo_api.clear()
         self.shp_layers = []
         self.api_layers = []
+        self.api_layers_by_name = {}
         self.wfs_layers_info.clear()
 
         for layer in QgsProject.instance().mapLayers().values():
@@ -423,10 +597,18 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
             if ("/featureserver/" in src or "/mapserver/" in src or
                     provider in ("arcgisfeatureserver", "arcgismapserver")):
                 self.combo_api.addItem(name)
-                self.api_layers.append(layer)
+                self._register_api_layer(layer)
 
         try:
-            wfs = WebFeatureService(url=self.WFS_URL, version=self.WFS_VERSION)
+            # Fetch capabilities through the shared session; owslib only parses them
+            params = {
+                "service": "WFS",
+                "version": self.WFS_VERSION,
+                "request": "GetCapabilities",
+            }
+            r = self.http.get(self.WFS_URL, params=params, timeout=self.timeout_meta)
+            r.raise_for_status()
+            wfs = WebFeatureService(url=self.WFS_URL, version=self.WFS_VERSION, xml=r.content)
             for layer_name, layer_obj in wfs.contents.items():
                 type_name = layer_name if layer_name.startswith("EPA:") else f"EPA:{layer_name}"
                 title = getattr(layer_obj, "title", layer_name)
@@ -490,18 +672,15 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
                 }
                 r = self.http.get(self.WFS_URL, params=params, timeout=self.timeout_meta)
                 r.raise_for_status()
-                root = ET.fromstring(r.content)
-
-                def strip_ns(tag):
-                    return tag.split('}', 1)[-1] if '}' in tag else tag
 
                 fields = []
-                for element in root.iter():
-                    if strip_ns(element.tag) == "element":
+                for _, element in ET.iterparse(io.BytesIO(r.content), events=("end",)):
+                    if element.tag == XSD_ELEMENT_TAG:
                         name_attr = element.attrib.get("name")
                         type_attr = element.attrib.get("type")
                         if name_attr and type_attr and not name_attr.lower().endswith("geom"):
                             fields.append(name_attr)
+                    element.clear()
 
                 self.wfs_fields_cache[type_name] = fields
                 for f in fields:
@@ -512,11 +691,8 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
             return
 
         try:
-            source_str = None
-            for lyr in self.api_layers:
-                if lyr.name() == api_name:
-                    source_str = lyr.source()
-                    break
+            lyr = self.api_layers_by_name.get(api_name)
+            source_str = lyr.source() if lyr else None
             if not source_str:
                 return
 
@@ -552,26 +728,96 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
     # -------------------------------
     # Remote download helpers
     # -------------------------------
-    def _load_geojson_text_as_layer(self, geojson_text: str, layer_name: str) -> QgsVectorLayer:
+    def _download_cache_path(self, url: str, params: dict) -> str:
+        """Cache file for a request; any change to the URL or query params gives a new key."""
+        key = f"{url}|{json.dumps(params, sort_keys=True, default=str)}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.download_cache_dir, f"{digest}.geojson")
+
+    def _load_cached_download(self, cache_path: str, layer_name: str) -> QgsVectorLayer:
+        """Open a previously downloaded GeoJSON if it is younger than the cache TTL."""
         try:
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".geojson")
-            tmp.close()
-            with open(tmp.name, "w", encoding="utf-8") as f:
-                f.write(geojson_text)
+            age = time.time() - os.path.getmtime(cache_path)
+        except OSError:
+            return None
 
-            lyr = QgsVectorLayer(tmp.name, layer_name, "ogr")
-            if lyr.isValid():
-                return lyr
-            self.log("Temporary GeoJSON layer is invalid.")
+        if age >= self.download_cache_ttl_s:
             return None
+
+        lyr = QgsVectorLayer(cache_path, layer_name, "ogr")
+        if lyr.isValid():
+            self.log(f"Using cached download ({age / 3600.0:.1f} h old): {cache_path}")
+            return lyr
+        return None
+
+    def _prune_download_cache(self) -> None:
+        """Delete cached downloads older than the cache TTL; files still in use are skipped."""
+        try:
+            names = os.listdir(self.download_cache_dir)
+        except OSError:
+            return
+
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.download_cache_dir, name)
+            try:
+                if now - os.path.getmtime(path) >= self.download_cache_ttl_s:
+                    os.remove(path)
+            except OSError:
+                continue
+
+    def _write_download_file(self, cache_path: str, chunks) -> None:
+        """Write byte chunks to the download cache via a .part file and an atomic rename."""
+        os.makedirs(self.download_cache_dir, exist_ok=True)
+        self._prune_download_cache()
+
+        part_path = cache_path + ".part"
+        try:
+            with open(part_path, "wb") as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+            os.replace(part_path, cache_path)
+        except Exception:
+            # Dropped stream / failed page fetch: don't leave a partial file behind
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            raise
+
+    def _open_downloaded_layer(self, cache_path: str, layer_name: str) -> QgsVectorLayer:
+        """Open a downloaded GeoJSON with OGR; invalid payloads are removed from the cache."""
+        lyr = QgsVectorLayer(cache_path, layer_name, "ogr")
+        if lyr.isValid():
+            return lyr
+        self.log("Downloaded GeoJSON layer is invalid.")
+        del lyr
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return None
+
+    def _load_geojson_response_as_layer(self, response: requests.Response, layer_name: str,
+                                        cache_path: str) -> QgsVectorLayer:
+        """
+        Stream a GeoJSON HTTP response to the download cache and open it with OGR.
+        The payload is written as raw bytes chunk by chunk, so it is never held
+        in memory as one decoded string.
+        """
+        try:
+            self._write_download_file(cache_path, response.iter_content(chunk_size=self.download_chunk_size))
+            return self._open_downloaded_layer(cache_path, layer_name)
         except Exception as e:
-            self.log(f"Failed to load temporary GeoJSON: {e}")
+            self.log(f"Failed to load downloaded GeoJSON: {e}")
             return None
 
     def _download_wfs_layer(self, type_name: str, buffer_geom_29903: QgsGeometry) -> QgsVectorLayer:
         try:
-            rect = buffer_geom_29903.boundingBox()
-            bbox = f"{rect.xMinimum()},{rect.yMinimum()},{rect.xMaximum()},{rect.yMaximum()},EPSG:29903"
+            # Server-side envelope filter; the exact buffer test is applied in run_prestep.
+            # The URN form pins the EPSG axis order (easting, northing) for WFS 1.1.0.
+            bbox = f"{self._geom_bbox_str(buffer_geom_29903)},{self.WFS_SRS_URN}"
 
             params = {
                 "service": "WFS",
@@ -579,14 +825,18 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
                 "request": "GetFeature",
                 "typename": type_name,
                 "outputFormat": "application/json",
-                "srsName": "EPSG:29903",
+                "srsName": self.WFS_SRS_URN,
                 "bbox": bbox,
             }
 
-            r = self.http.get(self.WFS_URL, params=params, timeout=self.timeout_data)
-            r.raise_for_status()
+            cache_path = self._download_cache_path(self.WFS_URL, params)
+            lyr = self._load_cached_download(cache_path, type_name)
+            if lyr is not None:
+                return lyr
 
-            lyr = self._load_geojson_text_as_layer(r.text, type_name)
+            with self.http.get(self.WFS_URL, params=params, timeout=self.timeout_data, stream=True) as r:
+                r.raise_for_status()
+                lyr = self._load_geojson_response_as_layer(r, type_name, cache_path)
             if lyr and lyr.isValid():
                 return lyr
             self.log("WFS GeoJSON layer invalid.")
@@ -610,8 +860,7 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
             if not base_url.endswith("/query"):
                 base_url = base_url + "/query"
 
-            rect = buffer_geom_29903.boundingBox()
-            bbox_str = f"{rect.xMinimum()},{rect.yMinimum()},{rect.xMaximum()},{rect.yMaximum()}"
+            bbox_str = self._geom_bbox_str(buffer_geom_29903)
 
             params = {
                 "where": "1=1",
@@ -621,12 +870,23 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
                 "inSR": 29903,
                 "spatialRel": "esriSpatialRelIntersects",
                 "outSR": 29903,
+                # EPSG:29903 is in meters; centimeter precision is ample and trims the payload
+                "geometryPrecision": 2,
                 "f": "geojson",
             }
 
-            r = self.http.get(base_url, params=params, timeout=self.timeout_data)
-            r.raise_for_status()
-            lyr = self._load_geojson_text_as_layer(r.text, "arcgis_api")
+            cache_path = self._download_cache_path(base_url, params)
+            lyr = self._load_cached_download(cache_path, "arcgis_api")
+            if lyr is not None:
+                return lyr
+
+            paging = self._arcgis_paging_plan(base_url, params)
+            if paging is not None:
+                lyr = self._download_arcgis_pages(base_url, params, paging, cache_path)
+            else:
+                with self.http.get(base_url, params=params, timeout=self.timeout_data, stream=True) as r:
+                    r.raise_for_status()
+                    lyr = self._load_geojson_response_as_layer(r, "arcgis_api", cache_path)
             if lyr and lyr.isValid():
                 return lyr
             self.log("ArcGIS GeoJSON layer invalid.")
@@ -635,6 +895,86 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
             self.log(f"ArcGIS REST download failed: {e}")
             return None
 
+    def _arcgis_layer_info(self, layer_url: str) -> dict:
+        """ArcGIS REST layer metadata (?f=json), cached per layer URL."""
+        if layer_url not in self.arcgis_info_cache:
+            r = self.http.get(layer_url, params={"f": "json"}, timeout=self.timeout_meta)
+            r.raise_for_status()
+            self.arcgis_info_cache[layer_url] = r.json()
+        return self.arcgis_info_cache[layer_url]
+
+    def _arcgis_paging_plan(self, query_url: str, params: dict):
+        """
+        Return (page_size, offsets, order_field) when the query result exceeds one page
+        and the service supports pagination; otherwise None (single request).
+        """
+        try:
+            info = self._arcgis_layer_info(query_url[:-len("/query")])
+            if not (info.get("advancedQueryCapabilities") or {}).get("supportsPagination"):
+                return None
+
+            page_size = min(self.arcgis_page_size, int(info.get("maxRecordCount") or self.arcgis_page_size))
+
+            count_params = dict(params, returnCountOnly="true", f="json")
+            rc = self.http.get(query_url, params=count_params, timeout=self.timeout_meta)
+            rc.raise_for_status()
+            count = int(rc.json().get("count", 0))
+        except Exception as e:
+            self.log(f"ArcGIS paging check failed, using a single request: {e}")
+            return None
+
+        if count <= page_size:
+            return None
+
+        self.log(f"ArcGIS query returns {count} features; fetching {math.ceil(count / page_size)} pages.")
+        return page_size, list(range(0, count, page_size)), info.get("objectIdField")
+
+    def _fetch_arcgis_page(self, query_url: str, params: dict) -> dict:
+        r = self.http.get(query_url, params=params, timeout=self.timeout_data)
+        r.raise_for_status()
+        data = r.json()
+        if "error" in data:
+            raise RuntimeError(f"ArcGIS query error: {data['error']}")
+        return data
+
+    def _arcgis_page_chunks(self, query_url: str, page_params: list):
+        """
+        Yield one merged GeoJSON FeatureCollection as byte chunks.
+        Pages are fetched concurrently in batches of arcgis_page_workers and written
+        in offset order, so at most one batch of pages is held in memory.
+        """
+        workers = self.arcgis_page_workers
+        first_feature = True
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for start in range(0, len(page_params), workers):
+                batch = page_params[start:start + workers]
+                pages = pool.map(lambda p: self._fetch_arcgis_page(query_url, p), batch)
+                for page_no, page in enumerate(pages, start):
+                    if page_no == 0:
+                        # Keep top-level members of the first page (e.g. "crs") so OGR reads EPSG:29903
+                        head = {k: v for k, v in page.items() if k not in ("features", "properties")}
+                        yield (json.dumps(head)[:-1] + (", " if head else "") + '"features": [').encode("utf-8")
+                    for feat in page.get("features", []):
+                        yield (("" if first_feature else ", ") + json.dumps(feat)).encode("utf-8")
+                        first_feature = False
+
+        yield b"]}"
+
+    def _download_arcgis_pages(self, query_url: str, params: dict, paging, cache_path: str) -> QgsVectorLayer:
+        """Fetch all result pages and stream them into one cached GeoJSON."""
+        page_size, offsets, order_field = paging
+
+        page_params = []
+        for offset in offsets:
+            p = dict(params, resultOffset=offset, resultRecordCount=page_size)
+            if order_field:
+                p["orderByFields"] = order_field
+            page_params.append(p)
+
+        self._write_download_file(cache_path, self._arcgis_page_chunks(query_url, page_params))
+        return self._open_downloaded_layer(cache_path, "arcgis_api")
+
     # -------------------------------
     # Pre-download data
     # -------------------------------
@@ -663,11 +1003,8 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
                 remote_layer = self._download_wfs_layer(type_name, buffer_geom_29903)
 
             if remote_layer is None:
-                source_str = None
-                for lyr in self.api_layers:
-                    if lyr.name() == api_name:
-                        source_str = lyr.source()
-                        break
+                lyr = self.api_layers_by_name.get(api_name)
+                source_str = lyr.source() if lyr else None
                 if source_str:
                     remote_layer = self._download_arcgis_layer(source_str, buffer_geom_29903)
 
@@ -678,7 +1015,8 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
                 return
 
             feats = []
-            idx = QgsSpatialIndex()
+            # Stored geometries let nearestNeighbor rank by exact geometry distance
+            idx = QgsSpatialIndex(QgsSpatialIndex.FlagStoreFeatureGeometries)
             remote_crs = remote_layer.crs() if remote_layer.crs().isValid() else self.metric_crs
 
             t_process = time.perf_counter()
@@ -686,6 +1024,9 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
             total_count = 0
             kept_count = 0
 
+            # Prepared buffer: GEOS indexes its segments once for all intersects tests
+            buffer_engine = self._prepared_engine(buffer_geom_29903)
+
             for f in remote_layer.getFeatures():
                 total_count += 1
 
@@ -697,13 +1038,16 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
                 if geom_29903.isEmpty():
                     continue
 
-                if not geom_29903.intersects(buffer_geom_29903):
+                if buffer_engine is not None:
+                    if not buffer_engine.intersects(geom_29903.constGet()):
+                        continue
+                elif not geom_29903.intersects(buffer_geom_29903):
                     continue
 
                 new_f = QgsFeature(f)
                 new_f.setGeometry(geom_29903)
                 feats.append(new_f)
-                idx.insertFeature(new_f)
+                self._insert_index_feature(idx, new_f)
                 kept_count += 1
 
             self.log(f"process remote features: {time.perf_counter() - t_process:.2f}s")
@@ -712,7 +1056,8 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
 
             self.api_pre_filtered[cache_key] = {
                 "features": feats,
-                "index": idx
+                "index": idx,
+                "lookup": {f.id(): f for f in feats},
             }
 
             self.log(f"Found {len(feats)} API features within buffer (EPSG:29903).")
@@ -725,9 +1070,8 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
     # Distance + direction helpers
     # -------------------------------
     def _azimuth_to_dir(self, deg: float) -> str:
-        dirs8 = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
         idx = int((deg + 22.5) // 45) % 8
-        return dirs8[idx]
+        return self.DIRECTIONS_8[idx]
 
     def _azimuth_geographic(self, p1, p2) -> float:
         dx = p2.x() - p1.x()
@@ -757,19 +1101,66 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
         pb = self._point_from_geometry(geom_b.nearestPoint(geom_a))
         return pa, pb
 
+    def _prepared_engine(self, geom: QgsGeometry):
+        """
+        Return a prepared GEOS engine for geom, so repeated distance / predicate
+        calls against it do not rebuild the GEOS geometry each time.
+        """
+        try:
+            engine = QgsGeometry.createGeometryEngine(geom.constGet())
+            engine.prepareGeometry()
+            return engine
+        except Exception as e:
+            self.log(f"Failed to prepare geometry engine: {e}")
+            return None
+
+    def _simplified_geometry(self, geom: QgsGeometry) -> QgsGeometry:
+        """
+        Douglas-Peucker simplified copy of a line / polygon geometry, used only for
+        nearest-neighbour ranking in the spatial index. Reported distances are
+        always computed on the original geometry.
+        """
+        if self.simplify_tolerance_m <= 0:
+            return geom
+        try:
+            gtype = QgsWkbTypes.geometryType(geom.wkbType())
+            if gtype not in (QgsWkbTypes.LineGeometry, QgsWkbTypes.PolygonGeometry):
+                return geom
+            simplified = geom.simplify(self.simplify_tolerance_m)
+            if simplified and not simplified.isEmpty():
+                return simplified
+        except Exception:
+            pass
+        return geom
+
+    def _insert_index_feature(self, idx: QgsSpatialIndex, feat: QgsFeature) -> None:
+        index_feat = QgsFeature(feat.id())
+        index_feat.setGeometry(self._simplified_geometry(feat.geometry()))
+        idx.insertFeature(index_feat)
+
+    def _exact_distance(self, app_engine, app_geom: QgsGeometry, geom: QgsGeometry) -> float:
+        if app_engine is not None:
+            return app_engine.distance(geom.constGet())
+        return geom.distance(app_geom)
+
     def _build_spatial_index_lookup(self, features):
-        idx = QgsSpatialIndex()
+        idx = QgsSpatialIndex(QgsSpatialIndex.FlagStoreFeatureGeometries)
         lookup = {}
         for f in features:
-            idx.insertFeature(f)
+            self._insert_index_feature(idx, f)
             lookup[f.id()] = f
         return idx, lookup
 
-    def _find_nearest_feature_spatial_index(self, app_union_29903: QgsGeometry, pre_data: dict):
+    def _find_nearest_feature_spatial_index(self, app_union_29903: QgsGeometry, pre_data: dict,
+                                            app_state: dict = None):
         """
         Optimized nearest search:
-        1) SpatialIndex nearestNeighbor by application centroid
-        2) Exact geometry distance to application geometry
+        1) SpatialIndex nearestNeighbor by application geometry (index stores
+           simplified feature geometries, so neighbours are ranked by distance)
+        2) Envelope query widened by the simplification tolerance, so every feature
+           that could be exactly nearest is kept
+        3) Exact geometry distance / shortest line on the original geometries
+        app_state (from _app_state) supplies the cached centroid, prepared engine and buffer.
         """
         feats = pre_data.get("features", [])
         idx = pre_data.get("index", None)
@@ -777,22 +1168,46 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
         if not feats:
             return None, None, None, None, None
 
+        feat_lookup = pre_data.get("lookup", None)
+
         if idx is None:
-            idx, _ = self._build_spatial_index_lookup(feats)
-        feat_lookup = {f.id(): f for f in feats}
+            idx, feat_lookup = self._build_spatial_index_lookup(feats)
+        elif feat_lookup is None:
+            feat_lookup = {f.id(): f for f in feats}
+
+        if app_state is None:
+            app_state = {
+                "union": app_union_29903,
+                "centroid": app_union_29903.centroid(),
+                "engine": self._prepared_engine(app_union_29903),
+                "buffers": {},
+            }
 
-        app_centroid = app_union_29903.centroid()
-        app_centroid_pt = app_centroid.asPoint()
+        app_centroid_pt = app_state["centroid"].asPoint()
         app_geom = app_union_29903
+        app_engine = app_state["engine"]
 
-        candidate_ids = idx.nearestNeighbor(QgsPointXY(app_centroid_pt), 10)
+        candidate_ids = idx.nearestNeighbor(app_geom, 1)
         if not candidate_ids:
             return None, None, None, None, None
 
+        if self.simplify_tolerance_m > 0:
+            # Simplified and original geometries differ by at most the tolerance,
+            # so the exact nearest lies within seed distance + tolerance. An envelope
+            # query returns a superset of those features; the lower-bound loop below
+            # ranks them exactly.
+            seed_dists = [
+                self._exact_distance(app_engine, app_geom, feat_lookup[cid].geometry())
+                for cid in candidate_ids if cid in feat_lookup
+            ]
+            if seed_dists:
+                search_rect = app_geom.boundingBox().buffered(min(seed_dists) + self.simplify_tolerance_m)
+                candidate_ids = idx.intersects(search_rect)
+
         candidates = [feat_lookup[cid] for cid in candidate_ids if cid in feat_lookup]
 
         if not candidates:
-            candidate_rect = app_union_29903.buffer(self.buffer_distance_m, 8).boundingBox()
+            candidate_rect = self._app_buffer(app_state, self.buffer_distance_m).boundingBox()
             candidate_ids_rect = idx.intersects(candidate_rect)
             candidates = [feat_lookup[cid] for cid in candidate_ids_rect if cid in feat_lookup]
 
@@ -804,19 +1219,31 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
         nearest_pt_on_api = None
         nearest_pt_on_app = None
 
+        # Visit candidates by envelope lower bound and stop once no remaining
+        # candidate can beat the best exact distance.
+        app_rect = app_geom.boundingBox()
+        ranked = []
         for feat in candidates:
             geom = feat.geometry()
             if not geom or geom.isEmpty():
                 continue
+            ranked.append((self._rect_distance(app_rect, geom.boundingBox()), feat))
+        ranked.sort(key=lambda item: item[0])
 
-            dist = geom.distance(app_geom)
+        for lower_bound, feat in ranked:
+            if min_dist is not None and lower_bound >= min_dist:
+                break
+
+            geom = feat.geometry()
+            dist = self._exact_distance(app_engine, app_geom, geom)
 
             if min_dist is None or dist < min_dist:
-                p_api, p_app = self._shortest_line_endpoints(geom, app_geom)
                 min_dist = dist
                 nearest_feat = feat
-                nearest_pt_on_api = p_api
-                nearest_pt_on_app = p_app
+
+        # Shortest line only for the final nearest feature, not for every improvement
+        if nearest_feat is not None:
+            nearest_pt_on_api, nearest_pt_on_app = self._shortest_line_endpoints(nearest_feat.geometry(), app_geom)
 
         return nearest_feat, min_dist, app_centroid_pt, nearest_pt_on_api, nearest_pt_on_app
 
@@ -842,15 +1269,14 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
             app_uri = app_layer.dataProvider().dataSourceUri()
 
             t0 = time.perf_counter()
-            app_feats_29903, app_union = self._layer_geometries_in_29903(app_layer)
-            self.log(f"_layer_geometries_in_29903: {time.perf_counter() - t0:.2f}s")
+            app_state = self._app_state(app_layer)
+            app_union = app_state["union"]
+            self.log(f"_app_state: {time.perf_counter() - t0:.2f}s")
 
             if not app_union or app_union.isEmpty():
                 QtWidgets.QMessageBox.warning(self, "Error", "Application layer has no valid geometry.")
                 return
 
-            app_centroid = app_union.centroid()
-
             self.buffer_distance_m = self._get_buffer_distance_m()
             self.log(
                 f"Using buffer distance: {self.buffer_distance_m / 1000.0:.2f} km "
@@ -859,7 +1285,7 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
 
             self._invalidate_cache_if_needed(api_name, app_uri, self.buffer_distance_m)
 
-            user_buffer_geom = app_union.buffer(self.buffer_distance_m, 8)
+            user_buffer_geom = self._app_buffer(app_state, self.buffer_distance_m)
 
             try:
                 QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
@@ -884,7 +1310,7 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
 
             t2 = time.perf_counter()
             nearest_feat, dist, app_centroid_pt, nearest_pt_on_api, nearest_pt_on_app = \
-                self._find_nearest_feature_spatial_index(app_union, pre_data)
+                self._find_nearest_feature_spatial_index(app_union, pre_data, app_state)
             self.log(f"_find_nearest_feature_spatial_index: {time.perf_counter() - t2:.2f}s")
 
             if nearest_feat is None:
@@ -954,17 +1380,20 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
 
             self.log("Opening Matplotlib Figure Window...")
 
-            fig, ax = plt.subplots(figsize=(10, 10))
+            fig, ax, fig_reused = self._analysis_figure(plt)
 
-            self._plot_qgs_geometry(ax, app_union, color="blue", linewidth=2, alpha=1.0, label="Application Area")
+            self._plot_qgs_geometry(ax, app_union, color="blue", linewidth=2, alpha=1.0,
+                                    label="Application Area", rasterized=True)
             self._plot_qgs_geometry(ax, nearest_feat.geometry(), color="cyan", linewidth=2, alpha=0.8,
-                                    label="Nearest Feature")
+                                    label="Nearest Feature", rasterized=True)
 
-            ax.scatter([app_centroid_pt.x()], [app_centroid_pt.y()], color="red", s=60, marker="o", label="Centroid")
-            ax.scatter([nearest_pt_on_app.x()], [nearest_pt_on_app.y()], color="orange", s=100, marker="x",
-                       label="Nearest Point - App")
-            ax.scatter([nearest_pt_on_api.x()], [nearest_pt_on_api.y()], color="green", s=100, marker="o",
-                       label="Nearest Point - API")
+            # Single markers as Line2D (markersize ~ sqrt of the former scatter area)
+            ax.plot(app_centroid_pt.x(), app_centroid_pt.y(), linestyle="none", color="red",
+                    marker="o", markersize=8, label="Centroid")
+            ax.plot(nearest_pt_on_app.x(), nearest_pt_on_app.y(), linestyle="none", color="orange",
+                    marker="x", markersize=10, label="Nearest Point - App")
+            ax.plot(nearest_pt_on_api.x(), nearest_pt_on_api.y(), linestyle="none", color="green",
+                    marker="o", markersize=10, label="Nearest Point - API")
 
             if not is_inside_case:
                 arrow = FancyArrowPatch(
@@ -1041,6 +1470,8 @@ class NearestAnalysisDialog(QtWidgets.QDialog):
             else:
                 self.log("Map export cancelled by user.")
 
+            if fig_reused:
+                fig.canvas.draw_idle()
             plt.show()
 
         except Exception as e: